@@ -3,113 +3,123 @@ Claims Data Generator - Creates realistic loss development patterns
 Designed specifically for loss triangle and development factor analysis
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from faker import Faker
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
 
-fake = Faker()
-Faker.seed(42)
-np.random.seed(42)
+try:
+    import numba
+except ImportError:  # Numba is optional; the NumPy path is the default
+    numba = None
 
+CHUNK_SIZE = 1_000_000  # Claims generated per worker task
+
+# Accident-year mix: more recent years have more claims. Generation is
+# sharded by year so parquet row groups align with the MergeTree partition
+# key and downstream aggregation can stream one shard at a time.
+_YEAR_WEIGHTS = [(2020, 0.15), (2021, 0.18), (2022, 0.20), (2023, 0.25), (2024, 0.22)]
+
+# Development factors based on industry patterns: (mean, std) per maturity bucket
+_DEV_FACTOR_PARAMS = np.array([
+    [0.95, 0.10],  # <= 12 months: claims develop downward initially
+    [1.02, 0.05],  # <= 24 months: some development
+    [1.01, 0.03],  # <= 36 months: minimal development
+    [1.00, 0.02],  # > 36 months: stable
+])
+
+
+def _scale_factors_numpy(buckets, z, means, stds):
+    return means[buckets] + stds[buckets] * z
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _scale_factors(buckets, z, means, stds):
+        out = np.empty(z.size)
+        for i in numba.prange(z.size):
+            out[i] = means[buckets[i]] + stds[buckets[i]] * z[i]
+        return out
+else:
+    _scale_factors = _scale_factors_numpy
+
+
+def _development_factors(rng, development_months):
+    """Draw one development factor per claim from its maturity bucket
+
+    The standard normals come from the caller's seeded RNG, so output is
+    reproducible whether the scaling runs through NumPy or Numba.
+    """
+    buckets = np.digitize(development_months, [12, 24, 36], right=True)
+    z = rng.standard_normal(development_months.size)
+    return _scale_factors(buckets, z, _DEV_FACTOR_PARAMS[:, 0], _DEV_FACTOR_PARAMS[:, 1])
+
+
+def _generate_claims_chunk(start_id, total_claims, policy_count, seed_seq, accident_year):
+    """Generate one independent chunk of claims for one accident year"""
+
+    rng = np.random.default_rng(np.random.SFC64(seed_seq))
 
-def generate_claims(policy_count=100_000, total_claims=500_000):
-    """Generate claims with realistic development patterns for triangles"""
-    
-    print(f"   🔄 Generating {total_claims:,} claims for {policy_count:,} policies...")
-    
     # Policy IDs to link to
-    policy_ids = np.random.randint(1, policy_count + 1, total_claims)
-    
-    # Claim IDs
-    claim_ids = range(1, total_claims + 1)
-    claim_numbers = [f"CLM{id:08d}" for id in claim_ids]
-    
-    # Accident dates (weighted toward recent years for realistic patterns)
-    start_date = datetime(2020, 1, 1)
-    end_date = datetime(2024, 12, 31)
-    
-    # Create accident year distribution (more recent claims)
-    accident_years = np.random.choice(
-        [2020, 2021, 2022, 2023, 2024],
-        total_claims,
-        p=[0.15, 0.18, 0.20, 0.25, 0.22]  # More recent years have more claims
+    policy_ids = rng.integers(1, policy_count + 1, total_claims, dtype=np.int32)
+
+    # Claim IDs; the CLM numbers are formatted in Arrow rather than one
+    # CPython f-string call per claim
+    claim_ids = np.arange(start_id, start_id + total_claims, dtype=np.int64)
+    claim_numbers = pc.binary_join_element_wise(
+        'CLM', pc.utf8_lpad(pc.cast(pa.array(claim_ids), pa.string()), 8, '0'), ''
     )
-    
-    accident_dates = []
-    for year in accident_years:
-        month = np.random.randint(1, 13)
-        day = np.random.randint(1, 29)  # Avoid month-end issues
-        accident_dates.append(datetime(year, month, day))
-    
+
+    # All claims in a chunk share one accident year (see _YEAR_WEIGHTS)
+    accident_years = np.full(total_claims, accident_year, dtype=np.int16)
+
+    # Accident dates in datetime64[D] arithmetic (days 1-28 avoid month-end issues)
+    year_part = np.datetime64(str(accident_year), 'Y')
+    month_part = rng.integers(0, 12, total_claims).astype('timedelta64[M]')
+    day_part = rng.integers(0, 28, total_claims).astype('timedelta64[D]')
+    accident_dates = (year_part + month_part).astype('datetime64[D]') + day_part
+
     # Report dates (some delay from accident)
-    report_delays = np.random.exponential(30, total_claims)  # Average 30-day delay
+    report_delays = rng.exponential(30, total_claims)  # Average 30-day delay
     report_delays = np.clip(report_delays, 0, 365)  # Max 1 year delay
-    
-    report_dates = [
-        acc_date + timedelta(days=int(delay))
-        for acc_date, delay in zip(accident_dates, report_delays)
-    ]
-    
-    # Development months (key for loss triangles)
-    development_months = []
-    for acc_date, rep_date in zip(accident_dates, report_dates):
-        # Calculate months since accident
-        months = (rep_date.year - acc_date.year) * 12 + (rep_date.month - acc_date.month)
-        development_months.append(max(1, months + 1))  # Start from month 1
-    
+
+    report_dates = accident_dates + report_delays.astype(np.int64).astype('timedelta64[D]')
+
+    # Development months (key for loss triangles) - months since accident, from month 1
+    month_diff = report_dates.astype('datetime64[M]') - accident_dates.astype('datetime64[M]')
+    development_months = (month_diff.astype(np.int16) + 1)
+
     # Claim amounts with realistic loss development
     # Initial reserves (often overestimated)
-    initial_reserves = np.random.lognormal(8.5, 1.5, total_claims)  # $5K-$50K typical
+    initial_reserves = rng.lognormal(8.5, 1.5, total_claims)  # $5K-$50K typical
     initial_reserves = np.round(initial_reserves, 2)
-    
-    # Development factors for different development months
-    def get_development_factor(dev_month):
-        """Realistic development factors based on industry patterns"""
-        if dev_month <= 12:
-            return np.random.normal(0.95, 0.1)  # Claims develop downward initially
-        elif dev_month <= 24:
-            return np.random.normal(1.02, 0.05)  # Some development
-        elif dev_month <= 36:
-            return np.random.normal(1.01, 0.03)  # Minimal development
-        else:
-            return np.random.normal(1.00, 0.02)  # Stable
-    
-    # Calculate developed amounts
-    developed_amounts = []
-    for i, (initial, dev_month) in enumerate(zip(initial_reserves, development_months)):
-        factor = get_development_factor(dev_month)
-        developed = initial * max(0.1, factor)  # Prevent negative claims
-        developed_amounts.append(round(developed, 2))
-    
+
+    # Development factors drawn per maturity bucket
+    factors = _development_factors(rng, development_months)
+
+    # Calculate developed amounts (floor factor at 0.1 to prevent negative claims)
+    developed_amounts = np.round(initial_reserves * np.maximum(0.1, factors), 2)
+
     # Payment patterns (claims pay out over time)
-    payment_patterns = np.random.beta(2, 5, total_claims)  # Most claims pay quickly
-    paid_amounts = [
-        round(developed * pattern, 2) 
-        for developed, pattern in zip(developed_amounts, payment_patterns)
-    ]
-    
-    # Outstanding reserves
-    outstanding_reserves = [
-        max(0, developed - paid) 
-        for developed, paid in zip(developed_amounts, paid_amounts)
-    ]
-    
-    # Claim status
-    claim_status = []
-    for outstanding in outstanding_reserves:
-        if outstanding <= 10:  # Small reserves considered closed
-            claim_status.append('Closed')
-        elif outstanding <= 1000:
-            claim_status.append('Open')
-        else:
-            claim_status.append('Reserved')
-    
+    payment_patterns = rng.beta(2, 5, total_claims)  # Most claims pay quickly
+    paid_amounts = np.round(developed_amounts * payment_patterns, 2)
+
+    # Outstanding reserves, clamped in place to skip a second temporary
+    outstanding_reserves = developed_amounts - paid_amounts
+    np.maximum(outstanding_reserves, 0.0, out=outstanding_reserves)
+
+    # Claim status (small reserves considered closed)
+    status_codes = np.digitize(outstanding_reserves, [10.0, 1000.0], right=True).astype(np.int8)
+    status_categories = ['Closed', 'Open', 'Reserved']
+
     # Line of business (should match policy, but simplified here)
     lob_choices = ['Motor', 'Property', 'Life', 'Health', 'Pension']
     lob_weights = [0.40, 0.30, 0.15, 0.10, 0.05]  # Motor claims most frequent
-    lines_of_business = np.random.choice(lob_choices, total_claims, p=lob_weights)
+    lob_codes = rng.choice(len(lob_choices), total_claims, p=lob_weights).astype(np.int8)
     
     # Claim causes (for categorical analysis)
     cause_by_lob = {
@@ -120,51 +130,129 @@ def generate_claims(policy_count=100_000, total_claims=500_000):
         'Pension': ['Retirement', 'Disability', 'Death', 'Withdrawal', 'Other']
     }
     
-    claim_causes = []
-    for lob in lines_of_business:
-        causes = cause_by_lob[lob]
-        weights = [0.3, 0.2, 0.2, 0.2, 0.1]  # First cause most common
-        claim_causes.append(np.random.choice(causes, p=weights))
-    
+    # One bulk draw per line of business instead of one RNG call per claim;
+    # draw local codes and remap them into a shared cause vocabulary
+    cause_categories = sorted({cause for causes in cause_by_lob.values() for cause in causes})
+    cause_weights = [0.3, 0.2, 0.2, 0.2, 0.1]  # First cause most common
+    claim_cause_codes = np.empty(total_claims, dtype=np.int8)
+    for code, (lob, causes) in enumerate(cause_by_lob.items()):
+        idx = np.where(lob_codes == lob_choices.index(lob))[0]
+        local_codes = np.array([cause_categories.index(cause) for cause in causes], dtype=np.int8)
+        claim_cause_codes[idx] = local_codes[rng.choice(len(causes), idx.size, p=cause_weights)]
+
     # Geography (simplified)
-    geographies = np.random.choice(
-        ['CA', 'TX', 'FL', 'NY', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI', 'Other'],
+    geo_choices = ['CA', 'TX', 'FL', 'NY', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI', 'Other']
+    geo_codes = rng.choice(
+        len(geo_choices),
         total_claims,
         p=[0.12, 0.10, 0.08, 0.08, 0.06, 0.05, 0.05, 0.04, 0.04, 0.04, 0.34]
-    )
+    ).astype(np.int8)
     
     # Additional claim attributes (as JSON)
-    claim_attributes = []
-    for i in range(total_claims):
-        attrs = {
-            'complexity': np.random.choice(['Simple', 'Medium', 'Complex'], p=[0.6, 0.3, 0.1]),
-            'legal_involvement': np.random.choice([True, False], p=[0.1, 0.9]),
-            'catastrophe_related': np.random.choice([True, False], p=[0.05, 0.95]),
-            'salvage_potential': np.random.choice([True, False], p=[0.15, 0.85])
-        }
-        claim_attributes.append(json.dumps(attrs))
+    # Fixed schema over small vocabularies: draw integer codes and index into
+    # precomputed JSON fragments instead of calling json.dumps per claim
+    complexity_json = np.array([
+        '{"complexity": "Simple"', '{"complexity": "Medium"', '{"complexity": "Complex"'
+    ])
+    legal_json = np.array([', "legal_involvement": true', ', "legal_involvement": false'])
+    catastrophe_json = np.array([', "catastrophe_related": true', ', "catastrophe_related": false'])
+    salvage_json = np.array([', "salvage_potential": true}', ', "salvage_potential": false}'])
+
+    complexity_idx = rng.choice(3, total_claims, p=[0.6, 0.3, 0.1])
+    legal_idx = rng.choice(2, total_claims, p=[0.1, 0.9])
+    catastrophe_idx = rng.choice(2, total_claims, p=[0.05, 0.95])
+    salvage_idx = rng.choice(2, total_claims, p=[0.15, 0.85])
+
+    claim_attributes = np.char.add(
+        np.char.add(complexity_json[complexity_idx], legal_json[legal_idx]),
+        np.char.add(catastrophe_json[catastrophe_idx], salvage_json[salvage_idx])
+    )
     
-    # Create DataFrame
-    df = pd.DataFrame({
-        'claim_id': claim_ids,
-        'claim_number': claim_numbers, 
-        'policy_id': policy_ids,
-        'accident_date': accident_dates,
-        'report_date': report_dates,
-        'accident_year': [date.year for date in accident_dates],
-        'development_month': development_months,
-        'line_of_business': lines_of_business,
-        'geography': geographies,
-        'claim_cause': claim_causes,
-        'claim_status': claim_status,
-        'initial_reserve': initial_reserves,
-        'paid_amount': paid_amounts,
-        'outstanding_reserve': outstanding_reserves,
-        'incurred_amount': developed_amounts,
-        'claim_attributes': claim_attributes
+    # Hand the columns straight to Arrow: categoricals become dictionary
+    # arrays and dates stay date32, so the parquet writer never sees pandas.
+    # Go via Table because large unicode columns convert as ChunkedArrays,
+    # then collapse to the single RecordBatch this chunk represents.
+    table = pa.Table.from_pydict({
+        'claim_id': pa.array(claim_ids),
+        'claim_number': claim_numbers,
+        'policy_id': pa.array(policy_ids),
+        'accident_date': pa.array(accident_dates),
+        'report_date': pa.array(report_dates),
+        'accident_year': pa.array(accident_years),
+        'development_month': pa.array(development_months),
+        'line_of_business': pa.DictionaryArray.from_arrays(pa.array(lob_codes), pa.array(lob_choices)),
+        'geography': pa.DictionaryArray.from_arrays(pa.array(geo_codes), pa.array(geo_choices)),
+        'claim_cause': pa.DictionaryArray.from_arrays(pa.array(claim_cause_codes), pa.array(cause_categories)),
+        'claim_status': pa.DictionaryArray.from_arrays(pa.array(status_codes), pa.array(status_categories)),
+        'initial_reserve': pa.array(initial_reserves),
+        'paid_amount': pa.array(paid_amounts),
+        'outstanding_reserve': pa.array(outstanding_reserves),
+        'incurred_amount': pa.array(developed_amounts),
+        'claim_attributes': pa.array(claim_attributes)
     })
-    
-    return df
+    return table.combine_chunks().to_batches()[0]
+
+
+def iter_claims_batches(policy_count=100_000, total_claims=500_000):
+    """Yield claims as CHUNK_SIZE-row Arrow RecordBatches while they are generated
+
+    Streaming consumers (e.g. a parquet writer) can persist each batch as a
+    row group without ever holding the full claims table in memory.
+    """
+
+    print(f"   🔄 Generating {total_claims:,} claims for {policy_count:,} policies...")
+
+    # Shard by accident year first (so each shard is one partition's worth
+    # of data), then split shards into CHUNK_SIZE worker tasks. Each chunk
+    # gets its own deterministic child seed so parallel runs reproduce.
+    year_counts = [int(total_claims * weight) for _, weight in _YEAR_WEIGHTS]
+    year_counts[-1] += total_claims - sum(year_counts)
+
+    chunk_sizes = []
+    chunk_years = []
+    for (year, _), year_count in zip(_YEAR_WEIGHTS, year_counts):
+        while year_count > CHUNK_SIZE:
+            chunk_sizes.append(CHUNK_SIZE)
+            chunk_years.append(year)
+            year_count -= CHUNK_SIZE
+        if year_count:
+            chunk_sizes.append(year_count)
+            chunk_years.append(year)
+    start_ids = [1 + sum(chunk_sizes[:i]) for i in range(len(chunk_sizes))]
+    seeds = np.random.SeedSequence(42).spawn(len(chunk_sizes))
+
+    if total_claims <= CHUNK_SIZE:
+        for start_id, size, seed, year in zip(start_ids, chunk_sizes, seeds, chunk_years):
+            yield _generate_claims_chunk(start_id, size, policy_count, seed, year)
+        return
+
+    workers = min(len(chunk_sizes), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            _generate_claims_chunk, start_ids, chunk_sizes, repeat(policy_count),
+            seeds, chunk_years
+        )
+
+
+def arrow_string_mapper(pa_type):
+    """types_mapper that keeps string columns Arrow-backed in pandas
+
+    Avoids materializing one Python str object per row for the JSON and
+    number columns; everything else keeps its default conversion so the
+    dictionary columns still become pandas Categoricals.
+    """
+    if pa_type == pa.string():
+        return pd.ArrowDtype(pa_type)
+    return None
+
+
+def generate_claims(policy_count=100_000, total_claims=500_000):
+    """Generate claims with realistic development patterns for triangles"""
+
+    batches = list(iter_claims_batches(policy_count, total_claims))
+    return pa.Table.from_batches(batches).to_pandas(
+        date_as_object=False, types_mapper=arrow_string_mapper
+    )
 
 
 if __name__ == "__main__":
@@ -7,12 +7,14 @@ Generates realistic actuarial datasets for loss triangles, mortality analysis, a
 import os
 import argparse
 from datetime import datetime
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet as pq
 from pathlib import Path
 
-from policies import generate_policies
-from claims import generate_claims  
-from reserves import generate_reserves
+from policies import generate_policies_table
+from claims import iter_claims_batches
+from reserves import ReserveAggregator, build_reserves
 
 
 def main():
@@ -49,34 +51,70 @@ def main():
     start_time = datetime.now()
     
     print("\n1️⃣  Generating policies...")
-    policies_df = generate_policies(count=config['policies'])
-    save_data(policies_df, output_dir / f'policies.{args.format}', args.format)
+    policies_table = generate_policies_table(count=config['policies'])
+    save_data(policies_table, output_dir / f'policies.{args.format}', args.format)
     
     print("2️⃣  Generating claims...")
-    claims_df = generate_claims(
-        policy_count=config['policies'], 
-        total_claims=config['claims']
-    )
-    save_data(claims_df, output_dir / f'claims.{args.format}', args.format)
+    # Stream batches straight to disk while folding them into the reserves
+    # aggregator, so the full claims table never exists in memory
+    aggregator = ReserveAggregator()
+
+    def aggregated_batches():
+        for batch in iter_claims_batches(policy_count=config['policies'],
+                                         total_claims=config['claims']):
+            aggregator.add_batch(batch)
+            yield batch
+
+    save_chunks(aggregated_batches(), output_dir / f'claims.{args.format}', args.format)
     
     print("3️⃣  Generating reserves...")  
-    reserves_df = generate_reserves(claims_df)
+    print(f"   🔄 Generating reserves for {aggregator.total_claims:,} claims...")
+    reserves_df = build_reserves(aggregator.contract_groups())
     save_data(reserves_df, output_dir / f'reserves.{args.format}', args.format)
     
     elapsed = datetime.now() - start_time
     print(f"\n✅ Data generation complete in {elapsed.total_seconds():.1f} seconds")
-    print(f"📈 Total records: {len(policies_df) + len(claims_df) + len(reserves_df):,}")
+    total_records = len(policies_table) + aggregator.total_claims + len(reserves_df)
+    print(f"📈 Total records: {total_records:,}")
+
 
+def save_data(data, filepath, format_type):
+    """Save a pyarrow Table or pandas DataFrame to specified format"""
+    if not isinstance(data, pa.Table):
+        data = pa.Table.from_pandas(data, preserve_index=False)
 
-def save_data(df, filepath, format_type):
-    """Save DataFrame to specified format"""
     if format_type == 'parquet':
-        df.to_parquet(filepath, index=False, compression='snappy')
+        pq.write_table(data, filepath, compression='snappy', row_group_size=1_000_000)
     else:
-        df.to_csv(filepath, index=False)
-    
+        pa.csv.write_csv(data, filepath)
+
+    size_mb = filepath.stat().st_size / (1024 * 1024)
+    print(f"   💾 {filepath.name}: {len(data):,} records ({size_mb:.1f} MB)")
+
+
+def save_chunks(batches, filepath, format_type):
+    """Stream Arrow RecordBatches to a single file, one parquet row group per batch"""
+    writer = None
+    total_records = 0
+    try:
+        for batch in batches:
+            if format_type == 'parquet':
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, batch.schema, compression='snappy')
+                writer.write_batch(batch)
+            else:
+                with open(filepath, 'wb' if total_records == 0 else 'ab') as f:
+                    pa.csv.write_csv(
+                        batch, f,
+                        write_options=pa.csv.WriteOptions(include_header=total_records == 0)
+                    )
+            total_records += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
     size_mb = filepath.stat().st_size / (1024 * 1024)
-    print(f"   💾 {filepath.name}: {len(df):,} records ({size_mb:.1f} MB)")
+    print(f"   💾 {filepath.name}: {total_records:,} records ({size_mb:.1f} MB)")
 
 
 if __name__ == "__main__":
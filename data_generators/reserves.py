@@ -5,62 +5,181 @@ Includes CSM calculations, risk adjustments, and present value factors
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import json
+from functools import reduce
 
-np.random.seed(42)
+rng = np.random.default_rng(np.random.SFC64(42))
+
+# Exceeds any policy_id so (group, policy) pairs pack into one int64
+_POLICY_SPAN = 1 << 33
+
+
+class ReserveAggregator:
+    """Accumulate contract-group aggregates from streamed claims batches
+
+    Claims arrive one Arrow RecordBatch at a time; only the per-group
+    running totals (and the deduplicated (group, policy) pairs) are kept,
+    so reserves can be produced without the full claims table in memory.
+    """
+
+    def __init__(self):
+        self._lob_categories = None
+        self._geo_categories = None
+        self._years = {}
+        self.total_claims = 0
+
+    def add_batch(self, batch):
+        """Fold one claims RecordBatch into the running aggregates"""
+        lob = batch.column('line_of_business')
+        geo = batch.column('geography')
+        if self._lob_categories is None:
+            self._lob_categories = lob.dictionary.to_pylist()
+            self._geo_categories = geo.dictionary.to_pylist()
+
+        n_geo = len(self._geo_categories)
+        n_keys = len(self._lob_categories) * n_geo
+        key = lob.indices.to_numpy().astype(np.int64) * n_geo + geo.indices.to_numpy()
+
+        years = batch.column('accident_year').to_numpy()
+        incurred = batch.column('incurred_amount').to_numpy()
+        paid = batch.column('paid_amount').to_numpy()
+        outstanding = batch.column('outstanding_reserve').to_numpy()
+        policy_ids = batch.column('policy_id').to_numpy().astype(np.int64)
+        self.total_claims += len(batch)
+
+        for year in np.unique(years):
+            mask = years == year
+            acc = self._years.setdefault(int(year), {
+                'claim_count': np.zeros(n_keys, dtype=np.int64),
+                'total_incurred': np.zeros(n_keys),
+                'total_paid': np.zeros(n_keys),
+                'total_outstanding': np.zeros(n_keys),
+                'policy_pairs': np.array([], dtype=np.int64),
+            })
+            year_key = key[mask]
+            acc['claim_count'] += np.bincount(year_key, minlength=n_keys)
+            acc['total_incurred'] += np.bincount(year_key, weights=incurred[mask], minlength=n_keys)
+            acc['total_paid'] += np.bincount(year_key, weights=paid[mask], minlength=n_keys)
+            acc['total_outstanding'] += np.bincount(year_key, weights=outstanding[mask], minlength=n_keys)
+            pairs = np.unique(year_key * _POLICY_SPAN + policy_ids[mask])
+            acc['policy_pairs'] = np.union1d(acc['policy_pairs'], pairs)
+
+    def contract_groups(self):
+        """Materialize the aggregates as a contract-group DataFrame"""
+        n_geo = len(self._geo_categories)
+        n_keys = len(self._lob_categories) * n_geo
+
+        parts = {column: [] for column in (
+            'lob_code', 'geo_code', 'cohort_year', 'policy_count',
+            'claim_count', 'total_incurred', 'total_paid', 'total_outstanding'
+        )}
+        for year in sorted(self._years):
+            acc = self._years[year]
+            occupied = np.nonzero(acc['claim_count'])[0]
+            policy_count = np.bincount(acc['policy_pairs'] // _POLICY_SPAN, minlength=n_keys)
+            parts['lob_code'].append(occupied // n_geo)
+            parts['geo_code'].append(occupied % n_geo)
+            parts['cohort_year'].append(np.full(occupied.size, year, dtype=np.int16))
+            parts['policy_count'].append(policy_count[occupied])
+            parts['claim_count'].append(acc['claim_count'][occupied])
+            parts['total_incurred'].append(acc['total_incurred'][occupied])
+            parts['total_paid'].append(acc['total_paid'][occupied])
+            parts['total_outstanding'].append(acc['total_outstanding'][occupied])
+        columns = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+        # Same (lob, geo, year) order a sorted groupby would yield
+        order = np.lexsort((columns['cohort_year'], columns['geo_code'], columns['lob_code']))
+        return pd.DataFrame({
+            'line_of_business': pd.Categorical.from_codes(
+                columns['lob_code'][order], categories=self._lob_categories),
+            'geography': pd.Categorical.from_codes(
+                columns['geo_code'][order], categories=self._geo_categories),
+            'cohort_year': columns['cohort_year'][order],
+            'policy_count': columns['policy_count'][order],
+            'claim_count': columns['claim_count'][order],
+            'total_incurred': columns['total_incurred'][order],
+            'total_paid': columns['total_paid'][order],
+            'total_outstanding': columns['total_outstanding'][order]
+        })
+
+
+def _aggregate_contract_groups(claims_df):
+    """Aggregate claims into (LoB, geography, cohort year) contract groups
+
+    Builds a composite integer key from the categorical codes and the
+    cohort year, then reduces every aggregate with np.bincount instead of
+    a string-hashing groupby over the full claims frame.
+    """
+
+    lob = claims_df['line_of_business']
+    geo = claims_df['geography']
+    years = claims_df['accident_year'].to_numpy().astype(np.int64)
+    year_min = int(years.min())
+    year_codes = years - year_min
+
+    n_geo = len(geo.cat.categories)
+    n_year = int(year_codes.max()) + 1
+    key = (lob.cat.codes.to_numpy().astype(np.int64) * n_geo
+           + geo.cat.codes.to_numpy()) * n_year + year_codes
+    n_keys = len(lob.cat.categories) * n_geo * n_year
+
+    claim_count = np.bincount(key, minlength=n_keys)
+    total_incurred = np.bincount(key, weights=claims_df['incurred_amount'], minlength=n_keys)
+    total_paid = np.bincount(key, weights=claims_df['paid_amount'], minlength=n_keys)
+    total_outstanding = np.bincount(key, weights=claims_df['outstanding_reserve'], minlength=n_keys)
+
+    # Distinct policies per group: dedupe on the (group, policy) pair first
+    policy_ids = claims_df['policy_id'].to_numpy().astype(np.int64)
+    policy_span = int(policy_ids.max()) + 1
+    unique_pairs = np.unique(key * policy_span + policy_ids)
+    policy_count = np.bincount(unique_pairs // policy_span, minlength=n_keys)
+
+    # Keep only the observed groups, in the same order a sorted groupby yields
+    occupied = np.nonzero(claim_count)[0]
+    year_code = occupied % n_year
+    geo_code = (occupied // n_year) % n_geo
+    lob_code = occupied // (n_year * n_geo)
+
+    return pd.DataFrame({
+        'line_of_business': pd.Categorical.from_codes(lob_code, categories=lob.cat.categories),
+        'geography': pd.Categorical.from_codes(geo_code, categories=geo.cat.categories),
+        'cohort_year': (year_code + year_min).astype(np.int16),
+        'policy_count': policy_count[occupied],
+        'claim_count': claim_count[occupied],
+        'total_incurred': total_incurred[occupied],
+        'total_paid': total_paid[occupied],
+        'total_outstanding': total_outstanding[occupied]
+    })
 
 
 def generate_reserves(claims_df):
     """Generate reserve data based on claims for IFRS 17 and reserve adequacy"""
-    
+
     print(f"   🔄 Generating reserves for {len(claims_df):,} claims...")
-    
-    # Group claims by policy/contract groups
-    contract_groups = claims_df.groupby(['line_of_business', 'geography', 'accident_year']).agg({
-        'policy_id': 'nunique',
-        'claim_id': 'count', 
-        'incurred_amount': 'sum',
-        'paid_amount': 'sum',
-        'outstanding_reserve': 'sum'
-    }).reset_index()
-    
-    contract_groups.columns = [
-        'line_of_business', 'geography', 'cohort_year', 
-        'policy_count', 'claim_count', 'total_incurred', 
-        'total_paid', 'total_outstanding'
-    ]
-    
+
+    return build_reserves(_aggregate_contract_groups(claims_df))
+
+
+def build_reserves(contract_groups):
+    """Derive IFRS 17 reserve measures for pre-aggregated contract groups"""
+
+    group_count = len(contract_groups)
+
     # Generate contract group IDs
-    contract_groups['contract_group_id'] = [
-        f"{lob}_{geo}_{year}"
-        for lob, geo, year in zip(
-            contract_groups['line_of_business'],
-            contract_groups['geography'],
-            contract_groups['cohort_year']
-        )
-    ]
-    
-    # Valuation dates (quarterly reporting)
-    valuation_dates = []
-    base_date = datetime(2024, 12, 31)  # Latest valuation
-    for i in range(len(contract_groups)):
-        # Random recent quarter-end date
-        quarters_back = np.random.randint(0, 8)  # Up to 2 years back
-        val_date = base_date - timedelta(days=quarters_back * 90)
-        # Snap to quarter end
-        if val_date.month <= 3:
-            val_date = val_date.replace(month=3, day=31) 
-        elif val_date.month <= 6:
-            val_date = val_date.replace(month=6, day=30)
-        elif val_date.month <= 9:
-            val_date = val_date.replace(month=9, day=30)
-        else:
-            val_date = val_date.replace(month=12, day=31)
-        valuation_dates.append(val_date)
-    
-    contract_groups['valuation_date'] = valuation_dates
-    
+    contract_groups['contract_group_id'] = (
+        contract_groups['line_of_business'].astype(str) + '_'
+        + contract_groups['geography'].astype(str) + '_'
+        + contract_groups['cohort_year'].astype(str)
+    )
+
+    # Valuation dates (quarterly reporting): random recent quarter, snapped
+    # to quarter end with period arithmetic instead of per-row replace()
+    base_date = np.datetime64('2024-12-31')  # Latest valuation
+    quarters_back = rng.integers(0, 8, group_count)  # Up to 2 years back
+    raw_dates = pd.Series(base_date - (quarters_back * 90).astype('timedelta64[D]'))
+    contract_groups['valuation_date'] = (
+        raw_dates.dt.to_period('Q').dt.to_timestamp(how='end').dt.normalize()
+    )
+
     # IFRS 17 Present Value calculations
     # Discount rates by line of business (annual rates)
     discount_rates = {
@@ -70,169 +189,113 @@ def generate_reserves(claims_df):
         'Health': 0.040,
         'Pension': 0.035
     }
-    
-    # Calculate present values
-    pv_factors = []
-    present_value_claims = []
-    present_value_premiums = []
-    
-    for _, row in contract_groups.iterrows():
-        lob = row['line_of_business']
-        rate = discount_rates.get(lob, 0.04)
-        
-        # Duration varies by line of business
-        if lob == 'Life':
-            duration = np.random.normal(15, 5)  # Long-term
-        elif lob == 'Pension':
-            duration = np.random.normal(20, 8)  # Very long-term
-        else:
-            duration = np.random.normal(3, 1)   # Short-term
-        
-        duration = max(0.5, duration)
-        
-        # Present value factor
-        pv_factor = 1 / (1 + rate) ** duration
-        pv_factors.append(round(pv_factor, 6))
-        
-        # Apply to claims and estimate premiums
-        pv_claims = row['total_incurred'] * pv_factor
-        present_value_claims.append(round(pv_claims, 2))
-        
-        # Estimate premiums (typically 110-120% of claims for profitability)
-        premium_ratio = np.random.uniform(1.10, 1.20)
-        pv_premiums = pv_claims * premium_ratio
-        present_value_premiums.append(round(pv_premiums, 2))
-    
-    contract_groups['pv_factor'] = pv_factors
-    contract_groups['pv_claims'] = present_value_claims
-    contract_groups['pv_premiums'] = present_value_premiums
-    
+
+    rates = contract_groups['line_of_business'].map(discount_rates).fillna(0.04).to_numpy()
+
+    # Duration varies by line of business
+    life_mask = (contract_groups['line_of_business'] == 'Life').to_numpy()
+    pension_mask = (contract_groups['line_of_business'] == 'Pension').to_numpy()
+    other_mask = ~(life_mask | pension_mask)
+    durations = np.empty(group_count)
+    durations[life_mask] = rng.normal(15, 5, life_mask.sum())       # Long-term
+    durations[pension_mask] = rng.normal(20, 8, pension_mask.sum()) # Very long-term
+    durations[other_mask] = rng.normal(3, 1, other_mask.sum())      # Short-term
+    durations = np.maximum(0.5, durations)
+
+    # Present value factors, applied to claims and estimated premiums
+    # (premiums typically 110-120% of claims for profitability)
+    pv_factors = 1 / (1 + rates) ** durations
+    pv_claims = np.round(contract_groups['total_incurred'].to_numpy() * pv_factors, 2)
+    premium_ratios = rng.uniform(1.10, 1.20, group_count)
+    pv_premiums = np.round(pv_claims * premium_ratios, 2)
+
+    contract_groups['pv_factor'] = np.round(pv_factors, 6)
+    contract_groups['pv_claims'] = pv_claims
+    contract_groups['pv_premiums'] = pv_premiums
+
     # Risk Adjustments (regulatory requirement)
     # Typically 5-15% of present value of claims
-    risk_adjustment_rates = np.random.uniform(0.05, 0.15, len(contract_groups))
-    contract_groups['risk_adjustment'] = [
-        round(pv_claims * rate, 2)
-        for pv_claims, rate in zip(present_value_claims, risk_adjustment_rates)
-    ]
-    
+    risk_adjustment_rates = rng.uniform(0.05, 0.15, group_count)
+    risk_adjustments = np.round(pv_claims * risk_adjustment_rates, 2)
+    contract_groups['risk_adjustment'] = risk_adjustments
+
     # Acquisition Costs (simplified)
     # Typically 10-25% of premiums for new business
-    acquisition_cost_rates = np.random.uniform(0.10, 0.25, len(contract_groups))
-    contract_groups['acquisition_costs'] = [
-        round(pv_premiums * rate, 2)
-        for pv_premiums, rate in zip(present_value_premiums, acquisition_cost_rates)
-    ]
-    
+    acquisition_cost_rates = rng.uniform(0.10, 0.25, group_count)
+    acquisition_costs = np.round(pv_premiums * acquisition_cost_rates, 2)
+    contract_groups['acquisition_costs'] = acquisition_costs
+
     # IFRS 17 CSM Calculation
     # CSM = PV Premiums - PV Claims - Acquisition Costs - Risk Adjustment (if profitable)
-    csm_values = []
-    loss_components = []
-    profitability_classes = []
-    
-    for _, row in contract_groups.iterrows():
-        pv_premiums = row['pv_premiums']
-        pv_claims = row['pv_claims']
-        acq_costs = row['acquisition_costs']
-        risk_adj = row['risk_adjustment']
-        
-        # Calculate net margin
-        net_margin = pv_premiums - pv_claims - acq_costs - risk_adj
-        
-        if net_margin > 0:
-            # Profitable contract - CSM recognized
-            csm_values.append(round(net_margin, 2))
-            loss_components.append(0.0)
-            profitability_classes.append('Profitable')
-        else:
-            # Onerous contract - loss component recognized
-            csm_values.append(0.0)
-            loss_components.append(round(abs(net_margin), 2))
-            profitability_classes.append('Onerous')
-    
-    contract_groups['initial_csm'] = csm_values
+    net_margins = pv_premiums - pv_claims - acquisition_costs - risk_adjustments
+    profitable = net_margins > 0
+
+    initial_csm = np.where(profitable, np.round(net_margins, 2), 0.0)
+    loss_components = np.where(profitable, 0.0, np.round(np.abs(net_margins), 2))
+    contract_groups['initial_csm'] = initial_csm
     contract_groups['loss_component'] = loss_components
-    contract_groups['profitability_class'] = profitability_classes
-    
+    contract_groups['profitability_class'] = pd.Categorical.from_codes(
+        (~profitable).astype(np.int8), categories=['Profitable', 'Onerous']
+    )
+
     # CSM Coverage Units (for amortization)
-    # Simplified: based on policy count and duration
-    coverage_units_total = []
-    coverage_units_current = []
-    
-    for _, row in contract_groups.iterrows():
-        # Total coverage units = policies × expected coverage period (months)
-        if row['line_of_business'] == 'Life':
-            months = np.random.randint(120, 480)  # 10-40 years
-        elif row['line_of_business'] == 'Pension':
-            months = np.random.randint(240, 600)  # 20-50 years
-        else:
-            months = np.random.randint(12, 60)    # 1-5 years
-            
-        total_units = row['policy_count'] * months
-        coverage_units_total.append(total_units)
-        
-        # Current period units (remaining)
-        remaining_ratio = np.random.uniform(0.5, 1.0)  # 50-100% remaining
-        current_units = int(total_units * remaining_ratio)
-        coverage_units_current.append(current_units)
-    
+    # Total coverage units = policies x expected coverage period (months)
+    coverage_months = np.empty(group_count, dtype=np.int64)
+    coverage_months[life_mask] = rng.integers(120, 480, life_mask.sum())       # 10-40 years
+    coverage_months[pension_mask] = rng.integers(240, 600, pension_mask.sum()) # 20-50 years
+    coverage_months[other_mask] = rng.integers(12, 60, other_mask.sum())       # 1-5 years
+
+    coverage_units_total = contract_groups['policy_count'].to_numpy() * coverage_months
+    remaining_ratios = rng.uniform(0.5, 1.0, group_count)  # 50-100% remaining
+    coverage_units_current = (coverage_units_total * remaining_ratios).astype(np.int64)
+
     contract_groups['coverage_units_total'] = coverage_units_total
     contract_groups['coverage_units_current'] = coverage_units_current
-    
-    # CSM Amortization for current period
-    csm_amortization = []
-    for _, row in contract_groups.iterrows():
-        if row['coverage_units_total'] > 0:
-            amort_rate = row['coverage_units_current'] / row['coverage_units_total']
-            amortization = row['initial_csm'] * amort_rate * 0.25  # Quarterly rate
-            csm_amortization.append(round(amortization, 2))
-        else:
-            csm_amortization.append(0.0)
-    
-    contract_groups['csm_amortization'] = csm_amortization
-    
+
+    # CSM Amortization for current period (quarterly rate)
+    amort_rates = np.divide(
+        coverage_units_current, coverage_units_total,
+        out=np.zeros(group_count), where=coverage_units_total > 0
+    )
+    contract_groups['csm_amortization'] = np.round(initial_csm * amort_rates * 0.25, 2)
+
     # Best Estimate Liability (BEL)
-    contract_groups['best_estimate_liability'] = [
-        round(pv_claims + risk_adj, 2)
-        for pv_claims, risk_adj in zip(
-            contract_groups['pv_claims'], 
-            contract_groups['risk_adjustment']
-        )
-    ]
-    
+    best_estimate_liability = np.round(pv_claims + risk_adjustments, 2)
+    contract_groups['best_estimate_liability'] = best_estimate_liability
+
     # Total Liability for Remaining Coverage (LRC)
-    contract_groups['liability_remaining_coverage'] = [
-        round(bel + csm - loss, 2)
-        for bel, csm, loss in zip(
-            contract_groups['best_estimate_liability'],
-            contract_groups['initial_csm'],
-            contract_groups['loss_component']
-        )
-    ]
-    
+    contract_groups['liability_remaining_coverage'] = np.round(
+        best_estimate_liability + initial_csm - loss_components, 2
+    )
+
     # Reserve adequacy ratios (for traditional analysis)
-    contract_groups['reserve_adequacy_ratio'] = [
-        round(total_outstanding / max(1, pv_claims), 4)
-        for total_outstanding, pv_claims in zip(
-            contract_groups['total_outstanding'],
-            contract_groups['pv_claims']
-        )
-    ]
-    
-    # Additional metadata as JSON
-    reserve_metadata = []
-    for _, row in contract_groups.iterrows():
-        metadata = {
-            'actuarial_assumptions': {
-                'discount_rate': discount_rates.get(row['line_of_business'], 0.04),
-                'risk_margin': round(row['risk_adjustment'] / max(1, row['pv_claims']), 4)
-            },
-            'valuation_method': 'IFRS_17',
-            'confidence_level': np.random.choice([0.75, 0.85, 0.95], p=[0.2, 0.6, 0.2]),
-            'last_updated': row['valuation_date'].isoformat()
-        }
-        reserve_metadata.append(json.dumps(metadata))
+    contract_groups['reserve_adequacy_ratio'] = np.round(
+        contract_groups['total_outstanding'].to_numpy() / np.maximum(1, pv_claims), 4
+    )
     
-    contract_groups['reserve_metadata'] = reserve_metadata
+    # Additional metadata as JSON. The discount rate is constant per LoB,
+    # so the whole leading fragment is rendered once per category and
+    # indexed by code; only the truly row-varying fields are formatted
+    risk_margins = np.round(
+        contract_groups['risk_adjustment'].to_numpy()
+        / np.maximum(1, contract_groups['pv_claims'].to_numpy()),
+        4
+    )
+    confidence_levels = rng.choice([0.75, 0.85, 0.95], group_count, p=[0.2, 0.6, 0.2])
+    last_updated = pd.to_datetime(contract_groups['valuation_date']).dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+    lob_codes = contract_groups['line_of_business'].cat.codes.to_numpy()
+    metadata_prefixes = np.array([
+        f'{{"actuarial_assumptions": {{"discount_rate": {discount_rates.get(lob, 0.04)}, "risk_margin": '
+        for lob in contract_groups['line_of_business'].cat.categories
+    ])
+
+    contract_groups['reserve_metadata'] = reduce(np.char.add, [
+        metadata_prefixes[lob_codes],
+        risk_margins.astype(str),
+        '}, "valuation_method": "IFRS_17", "confidence_level": ', confidence_levels.astype(str),
+        ', "last_updated": "', last_updated.to_numpy().astype(str), '"}'
+    ])
     
     return contract_groups
 
@@ -5,11 +5,15 @@ Simple script to load data using SQL files
 """
 
 import os
+import re
 import sys
 import argparse
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import clickhouse_connect
+import sqlparse
+from clickhouse_connect.driver.tools import insert_file
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -27,14 +31,30 @@ def get_client():
     )
 
 
+# Full-line "--" comments; stripped before splitting so that comment-only
+# blocks don't become round trips
+_COMMENT_RE = re.compile(r'(?m)^\s*--.*$')
+
+
+def split_statements(sql_content):
+    """Split a SQL script into executable statements
+
+    sqlparse tokenizes properly, so semicolons inside string literals or
+    inline comments never truncate a statement.
+    """
+    sql_content = _COMMENT_RE.sub('', sql_content)
+    return [stmt.strip().rstrip(';') for stmt in sqlparse.split(sql_content) if stmt.strip(' \n;')]
+
+
 def execute_sql_file(client, sql_file, verbose=False):
-    """Execute a SQL file"""
+    """Execute a SQL file, one round trip per real statement"""
     try:
         with open(sql_file, 'r') as f:
             sql_content = f.read()
-        
-        # Split by semicolon and execute each statement
-        statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+
+        # The client already pins the database, so USE adds nothing but an RTT
+        statements = [stmt for stmt in split_statements(sql_content)
+                      if not stmt.upper().startswith('USE ')]
         
         for i, statement in enumerate(statements):
             if statement.strip():
@@ -49,6 +69,26 @@ def execute_sql_file(client, sql_file, verbose=False):
         return False
 
 
+def load_parquet_file(client, table, data_file, verbose=False):
+    """Stream a local parquet file straight into a table
+
+    ClickHouse ingests parquet column-by-column, so this skips the SQL
+    file round trip entirely for the plain local-load case.
+    """
+    try:
+        if verbose:
+            print(f"   Streaming {data_file} into {table}...")
+        insert_file(client, table, str(data_file), fmt='Parquet', settings={
+            'max_insert_threads': os.cpu_count(),
+            'input_format_parquet_allow_missing_columns': 1
+        })
+        return True
+
+    except Exception as e:
+        print(f"❌ Error loading {data_file}: {e}")
+        return False
+
+
 def main():
     parser = argparse.ArgumentParser(description='Load data into ClickHouse')
     parser.add_argument('--source', choices=['local', 's3'], default='local',
@@ -71,44 +111,59 @@ def main():
         print(f"❌ Cannot connect to ClickHouse: {e}")
         sys.exit(1)
     
-    # Determine which SQL files to run
+    # Determine what to load: direct parquet streaming for local files,
+    # SQL files for S3 (and for tables whose parquet is not on disk)
     sql_dir = Path('sql/02_load_data')
-    
+    data_dir = Path('data')
+    tables = ['policies', 'claims', 'reserves'] if args.table == 'all' else [args.table]
+
     if args.source == 's3':
-        sql_files = [sql_dir / 'load_from_s3.sql']
+        loads = [('s3', sql_dir / 'load_from_s3.sql')]
     else:
-        if args.table == 'all':
-            sql_files = [
-                sql_dir / 'load_policies.sql',
-                sql_dir / 'load_claims.sql', 
-                sql_dir / 'load_reserves.sql'
-            ]
+        loads = []
+        for table in tables:
+            data_file = data_dir / f'{table}.parquet'
+            if data_file.exists():
+                loads.append((table, data_file))
+            else:
+                loads.append((table, sql_dir / f'load_{table}.sql'))
+
+    # Execute loads in parallel: the tables are independent and ClickHouse
+    # handles concurrent inserts, so don't serialize on the client side.
+    # Each worker gets its own client; the HTTP client is not thread-safe.
+    def run_load(table, source_file):
+        worker_client = get_client()
+        start_time = time.time()
+        if source_file.suffix == '.parquet':
+            success = load_parquet_file(worker_client, table, source_file, args.verbose)
         else:
-            sql_files = [sql_dir / f'load_{args.table}.sql']
-    
-    # Execute SQL files
+            success = execute_sql_file(worker_client, source_file, args.verbose)
+        return success, time.time() - start_time
+
+    for table, source_file in loads:
+        if not source_file.exists():
+            print(f"⚠️  File not found: {source_file}")
+    loads = [(table, f) for table, f in loads if f.exists()]
+
     total_start = time.time()
     success_count = 0
-    
-    for sql_file in sql_files:
-        if not sql_file.exists():
-            print(f"⚠️  SQL file not found: {sql_file}")
-            continue
-            
-        print(f"\n📄 Executing {sql_file.name}...")
-        start_time = time.time()
-        
-        if execute_sql_file(client, sql_file, args.verbose):
-            elapsed = time.time() - start_time
-            print(f"✅ {sql_file.name} completed in {elapsed:.1f} seconds")
-            success_count += 1
-        else:
-            print(f"❌ {sql_file.name} failed")
-    
+
+    with ThreadPoolExecutor(max_workers=len(loads) or 1) as executor:
+        futures = {executor.submit(run_load, table, source_file): source_file
+                   for table, source_file in loads}
+        for future in as_completed(futures):
+            source_file = futures[future]
+            success, elapsed = future.result()
+            if success:
+                print(f"✅ {source_file.name} completed in {elapsed:.1f} seconds")
+                success_count += 1
+            else:
+                print(f"❌ {source_file.name} failed")
+
     total_elapsed = time.time() - total_start
     
     print(f"\n📊 Load Summary:")
-    print(f"   ✅ {success_count}/{len(sql_files)} files executed successfully")
+    print(f"   ✅ {success_count}/{len(loads)} loads completed successfully")
     print(f"   ⏱️  Total time: {total_elapsed:.1f} seconds")
     
     # Verify data loaded